@@ -1,7 +1,7 @@
 ###
 # main_str.py
 # This script provides a CLI for converting Bambu 3mf files to Prusa 3mf files.
-# It allows users to specify input and output files, decompress the input zip file,
+# It allows users to specify input and output files, read the input zip file,
 # process the 3mf files, and generate a new 3mf file with the converted content.
 # The script uses lxml for XML parsing.
 # @Author: Jaime C. Acosta
@@ -11,22 +11,101 @@
 # @Description: A CLI tool to convert Bambu 3mf files to Prusa 3mf files.
 ###
 import argparse
+import copy
 import os
-import shutil
 import tempfile
 import zipfile
 import re
+import io
 import logging
 import lxml.etree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
+from xml.sax.saxutils import quoteattr
+
+
+# Rewrites applied to Bambu .model content in a single pass; if file formats change, this may need to be updated
+#   model:       replace the model tag with a new one that has the correct namespaces for prusa format
+#   paint_color: replace the paint attribute with the slic3rpe namespace
+#   otherwise remove any namespaces (since we're doing direct string replacements), any p:UUID attributes,
+#   any encoding attributes (since lxml only likes utf-8) and the paint_seam attribute (not allowed in Prusa format)
+BAMBU_MODEL_RE = re.compile(
+    rb'(?P<model><model[ ].*">)'
+    rb'|(?P<paint_color>paint_color)'
+    rb'|xmlns=[^=]+"'
+    rb'|p:UUID[^"]+"[^"]+"'
+    rb'|encoding=[\'"][\w\d-]+[\'"]'
+    rb'|paint_seam="[0-9A-Z]*"'
+)
+BAMBU_MODEL_REPLACEMENTS = {
+    'model': b'<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02" xmlns:slic3rpe="http://schemas.slic3r.org/3mf/2017/06">',
+    'paint_color': b'slic3rpe:mmu_segmentation',
+}
+
+
+# Namespace of the 3mf core elements in the Prusa model template
+MODEL_NAMESPACE = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+RESOURCES_TAG = f"{{{MODEL_NAMESPACE}}}resources"
+BUILD_TAG = f"{{{MODEL_NAMESPACE}}}build"
+ITEM_TAG = f"{{{MODEL_NAMESPACE}}}item"
+
+# One parser configuration for every parse: drop ignorable whitespace nodes and allow very large models.
+# iterparse can't take a parser object, so it gets the same options as keyword arguments.
+XML_PARSER_OPTIONS = {'remove_blank_text': True, 'huge_tree': True}
+# xml:id values are never looked up, so don't build the id table
+XML_PARSER = ET.XMLParser(collect_ids=False, **XML_PARSER_OPTIONS)
+
+# Deflate level for the output 3mf; level 1 is much faster than the default 6 and barely larger on model XML
+ZIP_COMPRESSLEVEL = 1
+# Buffer size for the output file, so zipfile's many small writes don't each become a syscall
+ZIP_WRITE_BUFFER_SIZE = 32 * 1024
+
+
+def _bambu_model_replacement(match):
+    return BAMBU_MODEL_REPLACEMENTS.get(match.lastgroup, b'')
+
+
+@lru_cache(maxsize=None)
+def _parse_template(template_path):
+    # Templates are parsed once per process; callers must deepcopy the result before modifying it
+    return ET.parse(template_path, parser=XML_PARSER).getroot()
+
+
+@lru_cache(maxsize=None)
+def _model_converter(models_template, pretty_print):
+    # One converter per process, configured with only what the per-model pipeline uses; workers get these
+    # two values instead of a pickled copy of the whole converter for every model file
+    converter = Bambu2PrusaConverter(None, None, pretty_print=pretty_print)
+    converter.template_paths['models_template'] = models_template
+    return converter
+
+
+def _convert_one(bmodel_path, input_zip, models_template, pretty_print):
+    # Run the whole read -> parse -> inject -> serialize pipeline for one model file and return the file name
+    # together with the serialized Prusa model. lxml elements can't be pickled, so this runs entirely inside
+    # the worker process. If input_zip is given, bmodel_path is the name of the model file inside that zip,
+    # which model_convert_re reads itself so the raw content is only held while it is being rewritten.
+    converter = _model_converter(models_template, pretty_print)
+    try:
+        filename, obj_IDs_Element = converter.model_convert_re(bmodel_path, input_zip)
+    except ET.Error as e:
+        # lxml errors carry an error log that can't be pickled back to the parent process
+        raise ValueError(f"{bmodel_path}: {e}") from None
+    final_prusamodel = converter.inject_bobject2pobject(obj_IDs_Element)
+    return filename, converter.write_prusa_model(filename, final_prusamodel)
 
 
 class Bambu2PrusaConverter:
 
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file, output_file, compresslevel=ZIP_COMPRESSLEVEL, pretty_print=False):
         logging.debug("Initializing Bambu2PrusaConverter")
         self.input_file = input_file
         self.output_file = output_file
+        self.compresslevel = compresslevel
+        # Slicers ignore the whitespace, so only indent the output XML when it's meant to be read (e.g. debugging)
+        self.pretty_print = pretty_print
 
         # Define paths for templates and directories
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -38,29 +117,22 @@ class Bambu2PrusaConverter:
         self.template_paths['Content_Types_template'] = os.path.join(script_dir, "3mf_template/[Content_Types].xml")
         self.template_paths['Metadata'] = os.path.join(script_dir, "3mf_template/Metadata/")
 
-        self.temp_3mf_dir = tempfile.TemporaryDirectory().name
+        # Static template files are copied verbatim into every output, so read them only once
+        self._content_types_bytes = Path(self.template_paths['Content_Types_template']).read_bytes()
+        self._metadata_bytes = {}
+        if os.path.isdir(self.template_paths['Metadata']):
+            with os.scandir(self.template_paths['Metadata']) as entries:
+                for entry in entries:
+                    # only plain files go into the 3mf; DirEntry answers this without another stat
+                    if entry.is_file():
+                        self._metadata_bytes[entry.name] = Path(entry.path).read_bytes()
+        # .rels is only a handful of lines of known shape, so it is filled in as text rather than built as a tree
+        self._rels_template = Path(self.template_paths['.rels_template']).read_text(encoding='utf-8')
 
         self.bambu_model_paths = []
         # contains output object file names and the object ids within those files
         self.prusa_model_paths = {}
 
-    def decompress_zip(self, input_file=None):
-        # Decompress the zip file to a temporary directory
-        logging.debug("Decompressing zip file")
-        if input_file is None:
-            input_file = self.input_file
-        # Check if input file is provided
-        if not input_file:
-            raise ValueError("Please provide an input file.")
-        # Create a temporary directory for extraction
-        tempdir = tempfile.TemporaryDirectory().name
-
-        # Unzip the input file
-        with zipfile.ZipFile(input_file, 'r') as zip_ref:
-            zip_ref.extractall(tempdir)
-        # return the temporary directory path that contains the extracted files
-        return tempdir
-            
     def convert(self, input_file=None, output_file=None, extracted_path=None):
         logging.debug("Converting Bambu 3mf to Prusa 3mf")
         # Check if input and output files are provided
@@ -72,35 +144,40 @@ class Bambu2PrusaConverter:
 
             if not input_file or not output_file:
                 raise ValueError("Please provide both input and output files.")
-            #if we haven't specified an extracted path, we will decompress the zip file
+            #if we haven't specified an extracted path, we read the model files straight out of the zip file
+            input_zip = None
             if extracted_path==None:
-                extracted_path = self.decompress_zip(input_file)
-            objects_path = os.path.join(extracted_path,"3D","Objects")
-            # Check if the objects directory exists
-            if os.path.exists(objects_path):
-                # Parse all .model files
-                self.bambu_model_paths = list(Path(objects_path).rglob("*.model"))
-                if self.bambu_model_paths == None or self.bambu_model_paths == None:
-                    logging.error("No model files found")
-                    return 
-                
-            # Convert each model file to Prusa format
-            obj_IDs_Elements = []
-            for bmodel_path in self.bambu_model_paths:
-                filename, obj_IDs_Element = self.model_convert_re(bmodel_path)
-                obj_IDs_Elements.append([filename, obj_IDs_Element])
-
-            #inject the objects into the Prusa model template
-            prusamodel_filenames = []
-            for filename, obj_IDs_Element in obj_IDs_Elements:
-                final_prusamodel = self.inject_bobject2pobject(obj_IDs_Element)
-                #final_prusamodels.append([filename, final_prusamodel])
-                #logging.debug(ET.tostring(final_prusamodel, encoding='utf-8', pretty_print=True))
-                self.write_prusa_model(filename, final_prusamodel)
-                prusamodel_filenames.append(filename)
-
-            # Write the final Prusa model files
-            self.generate3mf_file(prusamodel_filenames, output_file)
+                input_zip = input_file
+                with zipfile.ZipFile(input_file, 'r') as zip_in:
+                    self.bambu_model_paths = [name for name in zip_in.namelist()
+                                              if name.startswith("3D/Objects/") and name.endswith(".model")]
+            else:
+                objects_path = os.path.join(extracted_path,"3D","Objects")
+                # Check if the objects directory exists
+                if os.path.exists(objects_path):
+                    # Parse all .model files
+                    self.bambu_model_paths = list(Path(objects_path).rglob("*.model"))
+            if not self.bambu_model_paths:
+                logging.error("No model files found")
+                raise ValueError("No models to generate 3mf file structure.")
+
+            # Convert each model file to Prusa format; the files are independent, so spread them over worker processes.
+            # The converted models are consumed as they arrive, so each one is written out and released in turn.
+            if len(self.bambu_model_paths) > 1:
+                max_workers = min(len(self.bambu_model_paths), os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    prusamodels = executor.map(_convert_one, self.bambu_model_paths, repeat(input_zip),
+                                               repeat(self.template_paths['models_template']), repeat(self.pretty_print))
+                    try:
+                        self.generate3mf_file(prusamodels, output_file)
+                    except Exception:
+                        # don't wait for the remaining conversions before reporting the error
+                        executor.shutdown(cancel_futures=True)
+                        raise
+            else:
+                prusamodels = (_convert_one(bmodel_path, input_zip, self.template_paths['models_template'], self.pretty_print)
+                               for bmodel_path in self.bambu_model_paths)
+                self.generate3mf_file(prusamodels, output_file)
             print(f"Output file created: {os.path.basename(output_file)}")
             logging.info(f"Output file created: {os.path.basename(output_file)}")
         except Exception as e:
@@ -111,50 +188,56 @@ class Bambu2PrusaConverter:
             # Clean up the temporary directory
             self.cleanup()
             
-    def model_convert_re(self, bmodel_path):
+    def model_convert_re(self, bmodel_path, input_zip=None):
         logging.debug(f"Processing model file: {bmodel_path}")
-        # Check if the file exists
-        if not os.path.exists(bmodel_path):
+        # Check if the file exists, unless it is read from the input zip
+        if input_zip is None and not os.path.exists(bmodel_path):
             logging.error(f"File not found: {bmodel_path}")
             return None, None
         
         relevant_objects = {}
         # convert the bambu model file to a prusa model file using regex and xml parsing
         try:
-            objects = {}
-            #we don't know what encoding is used for the xml string, so we force it to utf-8
+            #work on the raw bytes; we don't know what encoding is used for the xml string, so the encoding
+            #declaration is removed below and the parser reads it as utf-8
             logging.debug(f"Reading model file: {bmodel_path}")
-            with open(bmodel_path) as f:
-                content = f.read()
-            #Add any necessary namespaces and remove any unwanted attributes; if file formats change, this may need to be updated
-            #remove any namespaces since we're doing direct string replacements
-            rem_xmlns = re.sub(r'xmlns=[^=]+"', '', content)
-            #remove any p:UUID attributes
-            rem_pUUID = re.sub(r'p:UUID[^"]+"[^"]+"', '', rem_xmlns)
-            #remove any encoding attributes, since lxml only likes utf-8
-            rem_encoding = re.sub(r'encoding=[\'"][\w\d-]+[\'"]', "", rem_pUUID)
-            #replace the paint attribute with the slic3rpe namespace
-            rem_paint_color = rem_encoding.replace("paint_color", "slic3rpe:mmu_segmentation")
-            #replace the model tag with a new one that has the correct namespaces for prusa format
-            add_slic3rpe = re.sub(r'<model[ ].*">', r'<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02" xmlns:slic3rpe="http://schemas.slic3r.org/3mf/2017/06">', rem_paint_color)
-            #remove the paint_seam attribute, since it is not allowed in Prusa format
-            rem_paint_seam = re.sub("paint_seam=\"[0-9A-Z]*\"", "", add_slic3rpe)
+            if input_zip is not None:
+                with zipfile.ZipFile(input_zip, 'r') as zip_in:
+                    content = zip_in.read(bmodel_path)
+            else:
+                with open(bmodel_path, 'rb') as f:
+                    content = f.read()
+            #Add any necessary namespaces and remove any unwanted attributes in one pass over the content
+            prusa_content = BAMBU_MODEL_RE.sub(_bambu_model_replacement, content)
+            #only the rewritten content is parsed, so don't keep the raw buffer alive alongside it
+            del content
             logging.debug("Parsing XML content")
-            #parse the xml content and find the objects
-            bambu_tree = ET.fromstring(rem_paint_seam)
-            objects = bambu_tree.findall(".//{*}resources/{*}object")
+            #stream-parse the xml content, stopping only at the objects
+            objects = ET.iterparse(io.BytesIO(prusa_content), events=("end",), tag="{*}object", **XML_PARSER_OPTIONS)
 
             #for each object, check if it is of type "model" and add it to the relevant_objects dictionary; these are the only object types that are allowed in prousa format
-            for object in objects:
+            for _, object in objects:
+                logging.debug(f"Object type {object.attrib['type']} | id {object.attrib['id']}: ")
                 if object.attrib['type'] == "model":
                     relevant_objects[object.attrib['id']] = object
-                logging.debug(f"Object type {object.attrib['type']} | id {object.attrib['id']}: ")
-            
+                else:
+                    # free the subtree of objects we don't keep
+                    object.clear(keep_tail=True)
+
+            #the Prusa model is built in this tree (see inject_bobject2pobject), so drop everything else from its resources
+            if relevant_objects:
+                resources = next(iter(relevant_objects.values())).getparent()
+                for resource in list(resources):
+                    if relevant_objects.get(resource.get('id')) is not resource:
+                        resources.remove(resource)
+
         except FileNotFoundError:
             logging.error(f"Error: File '{bmodel_path}' not found.")
-            return
+            raise
         except Exception as e:
+            # objects collected before a parse error would give a model with only part of this file's objects
             logging.error(f"An error occurred: {e}")
+            raise
 
         # take only the basename of the bmodel_path to use as the filename in the prusa model
         model_filename = os.path.basename(bmodel_path)
@@ -165,33 +248,39 @@ class Bambu2PrusaConverter:
         logging.debug("Injecting Bambu objects into Prusa model template")
         if not bobjects:
             logging.warning("No objects to inject into the template. Will use empty template.")
-        # Open the Prusa model template file
-        with open(self.template_paths['models_template'], 'r', encoding='utf-8') as f:
-            template_content = f.read()
-
         #inject object into template file
         try:
             logging.debug("Injecting objects into the Prusa model template")
-            #create build element so that we can add items under it for each object
-            #build_element = ET.fromstring("<build></build>")
-            #read the template file
-            tree = ET.parse(self.template_paths['models_template'])
-            model = tree.getroot()
-            build = model.find(".//{*}build")
-            for bobject in bobjects:
-                build.append(ET.Element("item", objectid=bobject, transform="0.799151571 0 0 0 0.799151571 0 0 0 0.799151571 184.67373 221.31425 1.61151839", printable="1"))
-
-            # Convert the tree back to a string so we can modify using regex (much faster than using lxml for this)
-            template_content = ET.tostring(tree, encoding='unicode')
+            template = _parse_template(self.template_paths['models_template'])
+            if bobjects:
+                # Build the Prusa model in the tree the objects were parsed into; its model tag was already rewritten
+                # to the Prusa one. Moving a mesh into another document makes lxml re-home every node of it, which
+                # is far slower than copying in the few small template elements instead.
+                resources = next(iter(bobjects.values())).getparent()
+                model = resources.getparent()
+                for child in list(model):
+                    if child.tag != RESOURCES_TAG:
+                        model.remove(child)
+                # copy the template's metadata and build around the resources, keeping the template's order
+                before_resources = True
+                for child in template:
+                    if child.tag == RESOURCES_TAG:
+                        before_resources = False
+                    elif before_resources:
+                        resources.addprevious(copy.deepcopy(child))
+                    else:
+                        model.append(copy.deepcopy(child))
+            else:
+                #copy the template so the cached one stays untouched
+                model = copy.deepcopy(template)
+            # build is a direct child of the model element
+            build = model.find(BUILD_TAG)
             logging.debug("Model root element found")
+            # Add a build item for each object
             for bobject in bobjects:
-                logging.debug(f"Adding object {bobject} to template content")
-                template_content = re.sub("<resources>", "<resources>\n"+str(ET.tostring(bobjects[bobject], encoding='unicode', pretty_print=True)), template_content)
-
-            if template_content is None:
-                logging.error("Template content is None, cannot proceed with injection.")
-                return None
-            return ET.fromstring(template_content)
+                logging.debug(f"Adding build item for object {bobject}")
+                build.append(ET.Element(ITEM_TAG, objectid=bobject, transform="0.799151571 0 0 0 0.799151571 0 0 0 0.799151571 184.67373 221.31425 1.61151839", printable="1"))
+            return model
 
         except FileNotFoundError:
             logging.error(f"Error: File '{self.template_paths['models_template']}' not found.")
@@ -200,39 +289,18 @@ class Bambu2PrusaConverter:
             logging.error(f"An error occurred: {e}")
             raise
 
-    def compress_zip(self, ifolder_path, output_file=None):
-        logging.debug("Compressing files into zip")
-        # Check if the input folder path is provided
-        if not ifolder_path:
-            raise ValueError("No input folder provided for compression.")
-        if output_file is None:
-            output_file = self.output_file
-        # Re-zip contents into the output file
-        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zip_out:
-            for foldername, subfolders, filenames in os.walk(ifolder_path):
-                for filename in filenames:
-                    file_path = os.path.join(foldername, filename)
-                    arcname = os.path.relpath(file_path, ifolder_path)
-                    zip_out.write(file_path, arcname)
-        logging.info(f"Compressed files into {output_file}")
-
     def write_prusa_model(self, filename, prusa_model):
         logging.debug("Writing Prusa object")
-        # This function is a placeholder for any additional processing needed
-        tempdir = self.temp_3mf_dir
-        objects_dir = os.path.join(tempdir, "3D", "Objects")
-        os.makedirs(objects_dir, exist_ok=True)
-
+        # Serialize the Prusa model so it can be written into the output zip
         try:
             ###--3D/Objects/3dmodel.xml---###
-            # Create the 3D Objects directory and copy the model files
-            model_path = os.path.join(objects_dir, filename)
             if prusa_model == None or prusa_model == []:
                 logging.warning("Prusa model is empty, writing empty object.")
                 #return
-            prusa_model.getroottree().write(model_path, encoding='utf-8', xml_declaration=True, pretty_print=True)
+            return ET.tostring(prusa_model, encoding='utf-8', xml_declaration=True, pretty_print=self.pretty_print)
         except Exception as e:
             logging.error(f"An error occurred while writing Prusa object: {e}")
+            raise
 
     def generate3mf_file(self, final_prusamodels, output_file=None):
         logging.debug("Generating 3mf file structure")
@@ -241,59 +309,62 @@ class Bambu2PrusaConverter:
             output_file = self.output_file
         if not output_file:
             raise ValueError("Please provide an output file.")
-        # Check if there are any models to generate the 3mf file structure
-        if not final_prusamodels:
-            logging.error("No models to generate 3mf file structure.")
-            raise ValueError("No models to generate 3mf file structure.")
         try:
-            # Create the temporary directory for the 3mf file structure
+            # Write the 3mf file structure straight into a zip next to the output file, and only move it into
+            # place once it is complete, so a failed conversion neither leaves a truncated 3mf behind nor
+            # replaces an existing file
             print("Generating 3mf file structure...")
-            tempdir = self.temp_3mf_dir
-            # Create the necessary directories
-            rels_dir = os.path.join(tempdir, "_rels")
-            os.makedirs(rels_dir, exist_ok=True)
-            metadata_dir = os.path.join(tempdir, "Metadata")
-            os.makedirs(metadata_dir, exist_ok=True)
-
-
-            ###--[Content-Types].xml---###
-            # Copy the template files to the output directory
-            shutil.copy(self.template_paths['Content_Types_template'], os.path.join(tempdir, "[Content_Types].xml"))
-
-
-            ###--_rels/.rels---###
-            # Create the relationships file
-            rels_ET = ET.parse(self.template_paths['.rels_template'])
-            rels_tree = rels_ET.getroot()
-            relationship_number = 1
-            for model in final_prusamodels:
-                # Add a relationship for the model
-                rel = ET.fromstring(f'<Relationship Target="/3D/Objects/{model}" Id="rel-{relationship_number}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/3dmodel"/>')
-                relationship_number += 1
-                rels_tree.append(rel)
-            # Write the relationships file
-            rels_path = os.path.join(rels_dir, ".rels")
-            rels_ET.write(rels_path, encoding='utf-8', xml_declaration=True, pretty_print=True)
-
-            # Add the Metadata files if they exist
-            if os.path.exists(self.template_paths['Metadata']):
-                for file in os.listdir(self.template_paths['Metadata']):
-                    shutil.copy(os.path.join(self.template_paths['Metadata'], file), os.path.join(tempdir, "Metadata", file))
-
-            self.compress_zip(tempdir, output_file)
+            temp_output_file = None
+            try:
+                fd, temp_output_file = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(output_file) or '.')
+                with open(fd, 'wb', buffering=ZIP_WRITE_BUFFER_SIZE) as f, \
+                        zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED, compresslevel=self.compresslevel) as zip_out:
+
+                    ###--[Content-Types].xml---###
+                    # Copy the template files to the output zip
+                    zip_out.writestr("[Content_Types].xml", self._content_types_bytes)
+
+
+                    ###--3D/Objects/3dmodel.xml---###
+                    # Write each model as soon as it is available and add a relationship for it in the same pass
+                    relationships = []
+                    for model, model_content in final_prusamodels:
+                        zip_out.writestr(f"3D/Objects/{model}", model_content)
+                        relationships.append(f' <Relationship Target={quoteattr("/3D/Objects/" + model)} Id="rel-{len(relationships) + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/3dmodel"/>\n')
+                    # Check if there were any models to generate the 3mf file structure
+                    if not relationships:
+                        logging.error("No models to generate 3mf file structure.")
+                        raise ValueError("No models to generate 3mf file structure.")
+
+                    ###--_rels/.rels---###
+                    # Write the relationships file
+                    rels = self._rels_template.replace("</Relationships>", "".join(relationships) + "</Relationships>")
+                    zip_out.writestr("_rels/.rels", rels.encode('utf-8'))
+
+                    # Add the Metadata files if they exist
+                    for file, file_content in self._metadata_bytes.items():
+                        zip_out.writestr(f"Metadata/{file}", file_content)
+                # mkstemp creates the file readable only by its owner; give the output the usual permissions
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(temp_output_file, 0o666 & ~umask)
+                os.replace(temp_output_file, output_file)
+            except BaseException:
+                # only remove the temporary file if this call created it
+                if temp_output_file is not None and os.path.exists(temp_output_file):
+                    os.remove(temp_output_file)
+                raise
+
+            logging.info(f"Compressed files into {output_file}")
         except Exception as e:
             logging.error(f"An error occurred while generating 3mf file structure: {e}")
+            raise
 
     def cleanup(self):
         logging.debug("Cleaning up temporary files")
-        # Clear the temporary directory and reset the model paths
+        # Reset the model paths
         self.bambu_model_paths = []
         self.prusa_model_paths = {}
-        # Clean up the temporary directory
-        if os.path.exists(self.temp_3mf_dir):
-            shutil.rmtree(self.temp_3mf_dir)
-        # Reset the temporary directory
-        self.temp_3mf_dir = tempfile.TemporaryDirectory().name
         logging.debug("Temporary files cleaned up.")
 
 
@@ -312,7 +383,7 @@ Examples:
     parser.add_argument("output", nargs='?', default=None,
                         help="Output Prusa 3mf file (default: <input>-prusa.3mf)")
     parser.add_argument("-v", "--verbose", action="store_true",
-                        help="Enable verbose/debug output")
+                        help="Enable verbose/debug output (also indents the output XML)")
 
     args = parser.parse_args()
 
@@ -335,7 +406,7 @@ Examples:
         return 1
 
     # Run the conversion
-    converter = Bambu2PrusaConverter(args.input, args.output)
+    converter = Bambu2PrusaConverter(args.input, args.output, pretty_print=args.verbose)
     try:
         converter.convert()
         return 0
@@ -9,6 +9,10 @@ from tkinter import Tk, Label, Button, filedialog
 import lxml.etree as ET
 from pathlib import Path
 
+# compiled once at import rather than looked up in the re cache on every model file
+RE_ENCODING = re.compile("encoding=\"[0-9A-Z\\-]*\"")
+RE_PAINT_SEAM = re.compile("paint_seam=\"[0-9A-Z]*\"")
+
 class ZipProcessorGUI:
 
     def __init__(self, master):
@@ -123,9 +127,9 @@ class ZipProcessorGUI:
             with open(bmodel_path, encoding="utf-8") as f:
                 content = f.read()
             temp = ET.parse(bmodel_path)
-            rem_encoding = re.sub("encoding=\"[0-9A-Z\\-]*\"", "", content)
+            rem_encoding = RE_ENCODING.sub("", content)
             rem_paint_color = rem_encoding.replace("paint_color", "slic3rpe:mmu_segmentation")
-            rem_paint_seam = re.sub("paint_seam=\"[0-9A-Z]*\"", "", rem_paint_color)
+            rem_paint_seam = RE_PAINT_SEAM.sub("", rem_paint_color)
 
             bambu_tree = ET.fromstring(rem_paint_seam)
             objects = bambu_tree.findall(".//{*}resources/{*}object")